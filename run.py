@@ -1,172 +1,444 @@
 #!/usr/-bin/env python3
 
-import json
+import argparse
+import asyncio
+import hashlib
 import logging
-import time
+import re
+import sqlite3
 import random
 import sys
+from concurrent.futures import ThreadPoolExecutor
 import os
-from datetime import datetime
-from urllib.parse import quote_plus, unquote
-from typing import List, Dict, Optional
+import queue
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import unquote
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
-from jinja2 import Environment, FileSystemLoader
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from urllib3.util.retry import Retry
+from lxml import etree, html as lxml_html
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 
-# Import pustaka baru untuk Selenium
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# Halaman hasil Google selalu UTF-8; byte mentah langsung di-decode oleh
+# libxml2 tanpa deteksi charset dari requests.
+_SERP_HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+# XPath hasil pencarian dikompilasi sekali saat modul dimuat. Judul dan
+# penerbit diambil langsung sebagai string agar tidak perlu membungkus
+# setiap node menjadi objek Python.
+_RESULT_LINK_XPATH = etree.XPath('//a[starts-with(@href, "/url?q=")][.//div[@role="heading"]]')
+_HEADING_TEXT_XPATH = etree.XPath('string((.//div[@role="heading"])[1])', smart_strings=False)
+_PUBLISHER_TEXT_XPATH = etree.XPath('string((ancestor::div[1]//span)[1])', smart_strings=False)
+# Tautan hasil berbentuk /url?q=<url-tujuan>&sa=U&...
+_RESULT_HREF_RE = re.compile(r'/url\?q=([^&]+)')
+
+# Kumpulan kecil user-agent browser umum yang dirotasi per permintaan
+_USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4_1) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0',
+)
+
+def url_fingerprint(url: str) -> int:
+    # Sidik jari 64-bit untuk deduplikasi; set cukup menyimpan int kecil, bukan URL utuh
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), 'little')
+
+# Cache SQLite untuk halaman hasil pencarian (file: .http_cache.sqlite)
+SERP_CACHE_NAME = '.http_cache'
+# Cache SQLite untuk hasil tulis ulang Gemini, dipertahankan antar-run
+REWRITE_CACHE_FILE = 'rewrite_cache.db'
+GEMINI_FALLBACK_CONTENT = "Content could not be generated at this time."
+# Tabel penghapus karakter markdown (* dan #) dari jawaban Gemini dalam satu lintasan
+_MARKDOWN_STRIP_TABLE = str.maketrans('', '', '*#')
+
+# Satu Environment untuk seluruh proses. Template yang sudah dikompilasi
+# disimpan di JINJA_CACHE_DIR sehingga run berikutnya tidak perlu
+# mem-parse ulang template.html selama isinya tidak berubah.
+JINJA_CACHE_DIR = Path('.jinja_cache')
+_JINJA_ENV = Environment(
+    loader=FileSystemLoader('.'),
+    bytecode_cache=FileSystemBytecodeCache(str(JINJA_CACHE_DIR)),
+    auto_reload=False,
+)
 
 # ===================================================================
-# BAGIAN 1: KELAS SCRAPER (DENGAN PERBAIKAN COOKIE CONSENT)
+# BAGIAN 1: KELAS SCRAPER (BERBASIS REQUESTS, TANPA SELENIUM)
 # ===================================================================
 
 class GoogleNewsScraper:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, cache_hours: float = 1, max_connections: int = 4):
         self.base_search_url = "https://www.google.com/search"
         logging_level = logging.INFO
         logging.basicConfig(level=logging_level, format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
         
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36')
-        
-        self.logger.info("Initializing Selenium WebDriver...")
-        try:
-            self.driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
-        except Exception as e:
-            self.logger.error(f"Failed to initialize WebDriver: {e}")
-            self.driver = None
+        # Halaman hasil tbm=nws adalah HTML statis, jadi GET biasa dengan
+        # user-agent browser sudah cukup tanpa menjalankan Chrome.
+        # Query yang sama dalam jangka `cache_hours` dilayani dari cache lokal
+        # sehingga run ulang tidak mengunduh ulang SERP yang identik.
+        self.session = CachedSession(SERP_CACHE_NAME, backend='sqlite', expire_after=timedelta(hours=cache_hours))
+        # Koneksi keep-alive ke host yang sama dipakai ulang lewat pool urllib3.
+        # Kegagalan sementara (429 dan 5xx) dicoba ulang oleh adapter dengan
+        # exponential backoff, dan header Retry-After dihormati bila ada.
+        retry = Retry(
+            total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True, raise_on_status=False,
+        )
+        # Satu socket keep-alive per thread pengunduh, sehingga koneksi tidak
+        # pernah dibuang karena pool penuh ("connection pool is full").
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Cookie ini menggantikan klik tombol persetujuan cookie di browser
+        self.session.cookies.set('CONSENT', 'YES+', domain='.google.com')
 
-    def scrape_category(self, category_name: str, max_articles: int, gl_code: str, hl_code: str) -> List[Dict]:
-        if not self.driver:
-            self.logger.error("WebDriver not initialized. Skipping scrape.")
-            return []
+    def make_request(self, url: str, params: Optional[Dict] = None) -> Optional[requests.Response]:
+        try:
+            response = self.session.get(url, params=params, headers={'User-Agent': random.choice(_USER_AGENTS)}, timeout=30)
+        except requests.RequestException as e:
+            self.logger.error(f"Request to {url} failed: {e}")
+            return None
+        if response.status_code != 200:
+            self.logger.error(f"Request to {response.url} returned status {response.status_code}.")
+            return None
+        if getattr(response, 'from_cache', False): self.logger.info(f"Served from cache: {response.url}")
+        return response
 
-        articles = []
-        seen_urls = set()
+    def fetch_category(self, category_name: str, max_articles: int, gl_code: str, hl_code: str, start: int = 0) -> Optional[bytes]:
+        # Query string di-encode sekali oleh requests lewat `params`. `num` meminta
+        # cukup hasil dalam satu halaman (Google membatasi num=100) agar biasanya
+        # tidak perlu paginasi; ada cadangan untuk hasil duplikat/tanpa judul.
+        search_params = {'q': category_name, 'tbm': 'nws', 'gl': gl_code, 'hl': hl_code, 'num': min(100, max_articles * 2)}
+        if start: search_params['start'] = start
         
-        search_url = f"{self.base_search_url}?q={quote_plus(category_name)}&tbm=nws&gl={gl_code}&hl={hl_code}"
+        self.logger.info(f"Fetching search results for category: '{category_name}'" + (f" (start={start})" if start else ""))
+        response = self.make_request(self.base_search_url, params=search_params)
+        if response is None: return None
+        # CachedSession sudah membaca seluruh badan respons ke cache sebelum
+        # get() kembali, jadi byte mentah langsung dipakai tanpa streaming.
+        return response.content
+    
+    def clear_cache(self):
+        self.logger.info("Clearing cached search result pages.")
+        self.session.cache.clear()
+
+    def close(self):
+        self.session.close()
+
+def parse_serp(content: bytes, category_name: str, max_articles: int) -> Tuple[List[Dict], int]:
+    # Selain artikel, dikembalikan juga jumlah tautan hasil mentah di halaman
+    # (sebelum dedup dan filter) sebagai offset `start` halaman berikutnya.
+    articles = []
+    seen_fingerprints = set()
+    result_count = 0
+    
+    try:
+        tree = lxml_html.fromstring(content, parser=_SERP_HTML_PARSER)
+        # Satu cap waktu untuk seluruh halaman; semua artikel diambil dari respons yang sama
+        scraped_at = datetime.now().isoformat()
         
-        self.logger.info(f"Navigating to search results for category: '{category_name}'")
+        # Metode dan objek yang dipakai berulang di loop diikat ke variabel
+        # lokal; pesan debug hanya diformat jika level DEBUG aktif.
+        append_article, add_fingerprint = articles.append, seen_fingerprints.add
+        match_href, heading_text, publisher_text = _RESULT_HREF_RE.match, _HEADING_TEXT_XPATH, _PUBLISHER_TEXT_XPATH
+        debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
         
-        try:
-            self.driver.get(search_url)
+        result_links = _RESULT_LINK_XPATH(tree)
+        result_count = len(result_links)
+        for link_element in result_links:
+            if len(articles) >= max_articles: break
 
-            # ================================================================
-            # === PERBAIKAN UTAMA ADA DI SINI ===
-            # Kita secara otomatis mencari dan mengklik tombol persetujuan cookie
-            # sebelum melanjutkan. Ini akan membuka akses ke hasil pencarian.
-            # ================================================================
             try:
-                # Menunggu tombol "Reject all" muncul dan mengkliknya
-                reject_button = WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_element_located((By.XPATH, "//div[text()='Reject all']"))
-                )
-                reject_button.click()
-                self.logger.info("Cookie consent 'Reject all' button clicked.")
-                time.sleep(2) # Beri waktu halaman untuk memuat ulang setelah klik
-            except Exception:
-                # Jika tombol tidak ditemukan setelah 5 detik, lanjutkan saja
-                self.logger.info("Cookie consent button not found, proceeding...")
-
-            # Menunggu hingga hasil pencarian benar-benar muncul di halaman
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "search"))
-            )
-            
-            page_html = self.driver.page_source
-            soup = BeautifulSoup(page_html, 'html.parser')
-            
-            for link_element in soup.select('a[href^="/url?q="]'):
+                url = unquote(match_href(link_element.get('href')).group(1))
+                fingerprint = url_fingerprint(url)
+                if fingerprint in seen_fingerprints: continue
+                title = heading_text(link_element)
+                publisher = publisher_text(link_element) or "Unknown Source"
+                
+                append_article({
+                    'category': category_name, 'url': url, 'title': title,
+                    'publisher': publisher, 'scraped_at': scraped_at
+                })
+                add_fingerprint(fingerprint)
+                if debug_enabled: logging.debug(f"Scraped: {title[:60]}...")
+            except Exception as e:
+                logging.warning(f"Could not parse an article element: {e}")
+                continue
+    
+    except Exception as e:
+        logging.error(f"An error occurred while parsing results for '{category_name}': {e}")
+
+    return articles[:max_articles], result_count
+
+def scrape_category(scraper: GoogleNewsScraper, category_name: str, max_articles: int, gl_code: str, hl_code: str) -> List[Dict]:
+    content = scraper.fetch_category(category_name, max_articles, gl_code, hl_code)
+    if content is None: return []
+    articles, result_count = parse_serp(content, category_name, max_articles)
+
+    # Jika Google mengabaikan atau membatasi `num`, halaman pertama bisa
+    # berisi kurang dari `max_articles`; ambil satu halaman lanjutan saja,
+    # mulai dari hasil mentah setelah yang sudah dilihat di halaman pertama.
+    if 0 < len(articles) < max_articles:
+        content = scraper.fetch_category(category_name, max_articles, gl_code, hl_code, start=result_count)
+        if content is not None:
+            seen_fingerprints = {url_fingerprint(article['url']) for article in articles}
+            for article in parse_serp(content, category_name, max_articles)[0]:
                 if len(articles) >= max_articles: break
+                fingerprint = url_fingerprint(article['url'])
+                if fingerprint in seen_fingerprints: continue
+                articles.append(article)
+                seen_fingerprints.add(fingerprint)
 
-                heading = link_element.find('div', role='heading')
-                if not heading: continue
-
-                try:
-                    url = unquote(link_element['href'].split('/url?q=')[1].split('&sa=U')[0])
-                    if url in seen_urls: continue
-                    title = heading.get_text()
-                    parent_div = link_element.find_parent('div')
-                    publisher_tag = parent_div.find('span')
-                    publisher = publisher_tag.text if publisher_tag else "Unknown Source"
-                    
-                    article_data = {
-                        'category': category_name, 'url': url, 'title': title,
-                        'publisher': publisher, 'scraped_at': datetime.now().isoformat()
-                    }
-                    articles.append(article_data)
-                    seen_urls.add(url)
-                    self.logger.debug(f"Scraped: {title[:60]}...")
-                except Exception as e:
-                    self.logger.warning(f"Could not parse an article element: {e}")
-                    continue
-        
-        except Exception as e:
-            self.logger.error(f"An error occurred during scraping for '{category_name}': {e}")
+    logging.info(f"Finished scrape for '{category_name}'. Found {len(articles)} articles.")
+    return articles
 
-        self.logger.info(f"Finished scrape for '{category_name}'. Found {len(articles)} articles.")
-        return articles[:max_articles]
-    
-    def close(self):
-        if self.driver:
-            self.logger.info("Closing Selenium WebDriver.")
-            self.driver.quit()
+def scrape_all_categories(scraper: GoogleNewsScraper, categories: List[Dict], max_articles: int, gl_code: str, hl_code: str, concurrency: int) -> List[tuple]:
+    # Pengunduhan terikat I/O, jadi hingga `concurrency` kategori diunduh
+    # bersamaan lewat thread yang berbagi session (dan pool koneksinya).
+    # Parsing satu halaman hanya butuh sekitar setengah milidetik (dan lxml
+    # melepas GIL saat parsing), jadi setiap thread langsung mem-parse
+    # halamannya sendiri tanpa proses pekerja. Urutan hasil mengikuti
+    # urutan kategori.
+    category_names = []
+    for category in categories:
+        category_name = category.get('name')
+        if not category_name: logging.warning(f"Skipping invalid category entry: {category}"); continue
+        category_names.append(category_name)
+    if not category_names: return []
+
+    with ThreadPoolExecutor(max_workers=concurrency) as fetch_pool:
+        scraped = fetch_pool.map(lambda category_name: scrape_category(scraper, category_name, max_articles, gl_code, hl_code), category_names)
+        return list(zip(category_names, scraped))
 
 # ===================================================================
 # BAGIAN 2: FUNGSI-FUNGSI HELPER
 # ===================================================================
 
-def rewrite_with_gemini(article: Dict, api_key: str) -> Optional[Dict]:
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-pro')
+class TokenBucket:
+    """Membagikan token lewat asyncio.Queue yang diisi ulang setiap `interval` detik."""
+
+    def __init__(self, interval: float, capacity: int = 1):
+        self.interval = interval
+        self.tokens = asyncio.Queue(maxsize=capacity)
+        self.refill_task = None
+
+    async def _refill(self):
+        while True:
+            if not self.tokens.full(): self.tokens.put_nowait(None)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval > 0: self.refill_task = asyncio.create_task(self._refill())
+
+    def stop(self):
+        if self.refill_task: self.refill_task.cancel()
+
+    async def acquire(self):
+        if self.refill_task: await self.tokens.get()
+
+class RewriteCache:
+    """Menyimpan hasil tulis ulang Gemini di SQLite dengan kunci SHA-256 dari judul."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT)")
+
+    @staticmethod
+    def _key(title: str) -> str:
+        return hashlib.sha256(title.encode('utf-8')).hexdigest()
+
+    def get(self, title: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM kv WHERE key = ?", (self._key(title),)).fetchone()
+        return row[0] if row else None
+
+    def put(self, title: str, value: str):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (self._key(title), value))
+
+    def close(self):
+        self.conn.close()
+
+class BackgroundWriter:
+    """Menulis file dari antrean di thread tersendiri agar I/O disk tidak memblokir alur utama."""
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='background-writer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        # Kesalahan apa pun dicatat dan antrean tetap diproses, agar thread
+        # tidak mati diam-diam dan membuang file yang masih mengantre.
+        while (job := self.jobs.get()) is not None:
+            path, data = job
+            try:
+                with open(path, 'wb') as f: f.write(data)
+            except Exception as e:
+                logging.error(f"Failed to write '{path}': {e}")
+
+    def write(self, path: Path, data: bytes):
+        self.jobs.put((path, data))
+
+    def close(self):
+        # Menunggu semua pekerjaan yang sudah diantrekan selesai ditulis
+        self.jobs.put(None)
+        self.thread.join()
+
+# Kesalahan sementara (kuota/RPM habis, server sibuk) yang layak dicoba ulang
+GEMINI_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded, google_exceptions.InternalServerError,
+)
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    # Exponential backoff dengan jitter acak agar percobaan ulang tidak serempak
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+async def generate_with_retry(model, prompt: str, max_retries: int = 3, backoff_base: float = 1.0, backoff_cap: float = 30.0) -> Optional[str]:
+    for attempt in range(max_retries + 1):
+        try:
+            response = await model.generate_content_async(prompt)
+            return response.text
+        except GEMINI_RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                logging.error(f"Gemini API still failing after {max_retries} retries: {e}"); break
+            delay = backoff_delay(attempt, backoff_base, backoff_cap)
+            logging.warning(f"Gemini API temporarily unavailable ({e}). Retrying in {delay:.1f} seconds...")
+            await asyncio.sleep(delay)
+        except Exception as e:
+            logging.error(f"Failed to call Gemini API: {e}"); break
+    return None
+
+async def rewrite_with_gemini(article: Dict, model: genai.GenerativeModel, **retry_options) -> Optional[Dict]:
     prompt = f"You are an expert AI journalist. Based on the headline \"{article['title']}\", write a brief, high-quality news summary (1-2 paragraphs)."
+    logging.info(f"Rewriting article: {article['title'][:50]}...")
+    text = await generate_with_retry(model, prompt, **retry_options)
+    if text is None:
+        article['rewritten_content'] = GEMINI_FALLBACK_CONTENT
+    else:
+        article['rewritten_content'] = text.translate(_MARKDOWN_STRIP_TABLE)
+    return article
+
+def parse_batch_summaries(text: str, expected: int) -> Optional[List[str]]:
+    # Gemini kadang membungkus JSON dalam blok kode markdown (```json ... ```)
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        text = text.rsplit('```', 1)[0]
     try:
-        logging.info(f"Rewriting article: {article['title'][:50]}...")
-        response = model.generate_content(prompt)
-        article['rewritten_content'] = response.text.replace('*', '').replace('#', '')
-        return article
-    except Exception as e:
-        logging.error(f"Failed to call Gemini API: {e}")
-        article['rewritten_content'] = "Content could not be generated at this time."
-        return article
+        items = orjson.loads(text)
+        summaries = {int(item['index']): str(item['summary']) for item in items}
+    except (ValueError, TypeError, KeyError) as e:
+        logging.warning(f"Could not parse batched Gemini response: {e}")
+        return None
+    if any(i not in summaries for i in range(1, expected + 1)):
+        logging.warning(f"Batched Gemini response is missing summaries ({len(summaries)}/{expected}).")
+        return None
+    return [summaries[i] for i in range(1, expected + 1)]
+
+async def rewrite_batch_with_gemini(articles: List[Dict], model: genai.GenerativeModel, **retry_options) -> Optional[List[Dict]]:
+    headlines = "\n".join(f"{i}) {article['title']}" for i, article in enumerate(articles, 1))
+    prompt = (
+        "You are an expert AI journalist. For each headline below, write a brief, high-quality news summary (1-2 paragraphs). "
+        f"Return only a JSON array of length {len(articles)} whose items have the fields \"index\" (the headline number) and \"summary\".\n"
+        f"Headlines:\n{headlines}"
+    )
+    logging.info(f"Rewriting {len(articles)} articles in one batch, starting with: {articles[0]['title'][:50]}...")
+    text = await generate_with_retry(model, prompt, **retry_options)
+    summaries = parse_batch_summaries(text, len(articles)) if text is not None else None
+    if summaries is None: return None
+    for article, summary in zip(articles, summaries):
+        article['rewritten_content'] = summary.translate(_MARKDOWN_STRIP_TABLE)
+    return articles
+
+async def rewrite_all_categories(scraped_by_category: List[tuple], model: genai.GenerativeModel, concurrency: int, delay_seconds: float, retry_options: Dict, cache: RewriteCache) -> List[Dict]:
+    # Semaphore membatasi jumlah panggilan yang berjalan bersamaan, sedangkan
+    # token bucket menjaga laju awal panggilan (satu token per `delay_seconds`)
+    # sehingga anggaran RPM tetap sama seperti jeda time.sleep sebelumnya.
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(delay_seconds)
+    bucket.start()
+
+    async def rewrite_limited(article: Dict) -> Optional[Dict]:
+        async with semaphore:
+            await bucket.acquire()
+            return await rewrite_with_gemini(article, model, **retry_options)
+
+    async def rewrite_category(articles: List[Dict]) -> List[Dict]:
+        # Judul yang sudah pernah ditulis ulang diambil dari cache; sisanya
+        # dikirim dalam satu panggilan batch. Jika jawaban batch tidak bisa
+        # dipakai, kembali menulis ulang artikel satu per satu.
+        pending = []
+        for article in articles:
+            cached = cache.get(article['title'])
+            if cached is None: pending.append(article)
+            else: article['rewritten_content'] = cached
+        if len(pending) < len(articles):
+            logging.info(f"{len(articles) - len(pending)} of {len(articles)} rewrites served from cache.")
+        if not pending: return articles
+
+        async with semaphore:
+            await bucket.acquire()
+            rewritten = await rewrite_batch_with_gemini(pending, model, **retry_options)
+        if rewritten is None:
+            logging.warning("Falling back to per-article rewrites for this category.")
+            await asyncio.gather(*(rewrite_limited(article) for article in pending))
+
+        for article in pending:
+            if article['rewritten_content'] != GEMINI_FALLBACK_CONTENT:
+                cache.put(article['title'], article['rewritten_content'])
+        return articles
+
+    async def rewrite_entry(category_name: str, articles: List[Dict]) -> Dict:
+        return {"name": category_name, "articles": await rewrite_category(articles)}
+
+    try:
+        return await asyncio.gather(*(rewrite_entry(category_name, articles) for category_name, articles in scraped_by_category))
+    finally:
+        bucket.stop()
 
 def generate_static_site(articles_by_category: List[Dict], output_dir: str):
     try:
         logging.info("Generating static site file...")
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template('template.html')
-        html_content = template.render(articles_by_category=articles_by_category, generated_at=datetime.now().strftime('%d %B %Y, %H:%M:%S UTC'))
+        JINJA_CACHE_DIR.mkdir(exist_ok=True)
+        template = _JINJA_ENV.get_template('template.html')
         output_path = Path(output_dir) / "index.html"
-        with open(output_path, 'w', encoding='utf-8') as f: f.write(html_content)
+        # Hasil render ditulis bertahap ke file tanpa membangun string HTML utuh
+        template.stream(articles_by_category=articles_by_category, generated_at=datetime.now().strftime('%d %B %Y, %H:%M:%S UTC')).dump(str(output_path), encoding='utf-8')
         logging.info(f"Site successfully generated at: {output_path}")
     except Exception as e:
         logging.error(f"Failed to generate static site: {e}")
 
 def load_config(config_file: str = 'config.json') -> Dict:
     try:
-        with open(config_file, 'r', encoding='utf-8') as f: return json.load(f)
+        with open(config_file, 'rb') as f: return orjson.loads(f.read())
     except FileNotFoundError:
         logging.error(f"Configuration file '{config_file}' not found."); sys.exit(1)
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logging.error(f"Error decoding JSON from '{config_file}'."); sys.exit(1)
 
 # ===================================================================
 # BAGIAN 3: FUNGSI UTAMA (DENGAN PERBAIKAN NAMEERROR)
 # ===================================================================
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape Google News, rewrite the articles with Gemini and build the static site.")
+    parser.add_argument('--no-cache', action='store_true', help="clear cached search result pages before scraping")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     config = load_config()
     
@@ -177,46 +449,54 @@ def main():
     logging.info(f"--- Starting News Aggregator for region: {region_name} (gl={gl_code}, hl={hl_code}) ---")
     
     categories, posts_per_category, gemini_delay = config.get('categories', []), config.get('posts_per_category', 5), config.get('gemini_api_delay_seconds', 2)
+    scrape_concurrency, gemini_concurrency = config.get('scrape_concurrency', 4), config.get('gemini_concurrency', 4)
+    gemini_retry_options = {
+        'max_retries': config.get('gemini_max_retries', 3),
+        'backoff_base': config.get('gemini_retry_base_seconds', 1),
+        'backoff_cap': config.get('gemini_retry_cap_seconds', 30),
+    }
     output_dir = '.'
 
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     if not GEMINI_API_KEY:
         logging.error("GEMINI_API_KEY environment variable is not set! Exiting."); sys.exit(1)
 
-    scraper = GoogleNewsScraper(verbose=True)
+    scraper = GoogleNewsScraper(verbose=True, cache_hours=config.get('serp_cache_hours', 1), max_connections=scrape_concurrency)
+    if args.no_cache: scraper.clear_cache()
     
-    articles_for_template, total_articles_scraped = [], 0
-
     try:
-        for category in categories:
-            category_name = category.get('name')
-            if not category_name: logging.warning(f"Skipping invalid category entry: {category}"); continue
-                
-            scraped_articles = scraper.scrape_category(category_name, posts_per_category, gl_code, hl_code)
-            if not scraped_articles: continue
-            
-            total_articles_scraped += len(scraped_articles)
-            
-            rewritten_articles_for_category = []
-            for article in scraped_articles:
-                rewritten_article = rewrite_with_gemini(article, GEMINI_API_KEY)
-                if rewritten_article: rewritten_articles_for_category.append(rewritten_article)
-                logging.info(f"Waiting for {gemini_delay} seconds..."); time.sleep(gemini_delay)
-                
-            articles_for_template.append({"name": category_name, "articles": rewritten_articles_for_category})
+        scraped_by_category = [
+            (category_name, scraped_articles)
+            for category_name, scraped_articles in scrape_all_categories(scraper, categories, posts_per_category, gl_code, hl_code, scrape_concurrency)
+            if scraped_articles
+        ]
     finally:
         scraper.close()
+    total_articles_scraped = sum(len(scraped_articles) for _, scraped_articles in scraped_by_category)
+
+    # Klien Gemini dikonfigurasi sekali dan model yang sama dipakai untuk semua panggilan
+    genai.configure(api_key=GEMINI_API_KEY)
+    gemini_model = genai.GenerativeModel('gemini-pro')
+    rewrite_cache = RewriteCache(REWRITE_CACHE_FILE)
+    try:
+        articles_for_template = asyncio.run(rewrite_all_categories(
+            scraped_by_category, gemini_model, gemini_concurrency, gemini_delay, gemini_retry_options, rewrite_cache,
+        ))
+    finally:
+        rewrite_cache.close()
 
     if total_articles_scraped == 0: logging.warning("Scraping resulted in 0 articles. Generating an empty site.")
-    
-    # ================================================================
-    # === PERBAIKAN NAMEERROR ADA DI SINI ===
-    # Logika ini dipindahkan ke luar blok try...finally agar
-    # variabel 'output_dir' pasti terdefinisi dan dapat diakses.
-    # ================================================================
-    with open(Path(output_dir) / 'data.json', 'w', encoding='utf-8') as f: json.dump(articles_for_template, f, indent=2, ensure_ascii=False)
-        
-    generate_static_site(articles_for_template, output_dir)
+
+    # Penulisan data dikirim ke thread penulis agar berjalan bersamaan
+    # dengan render situs.
+    writer = BackgroundWriter()
+    try:
+        # data.json ditulis ringkas (tanpa indentasi)
+        writer.write(Path(output_dir) / 'data.json', orjson.dumps(articles_for_template))
+            
+        generate_static_site(articles_for_template, output_dir)
+    finally:
+        writer.close()
     logging.info("Process finished successfully.")
 
 if __name__ == "__main__":